@@ -1,10 +1,333 @@
 import streamlit as st
 import os
-import json
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from operator import attrgetter
+from pathlib import Path
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
+import httpx
+import numpy as np
+import orjson
+from aiolimiter import AsyncLimiter
+from lxml import etree
 from mem0 import Memory
-from openai import OpenAI
-import arxiv
+from qdrant_client import models
+from openai import OpenAI, AsyncOpenAI
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+ARXIV_PAGE_SIZE = 100
+REQUIRED_PAPER_FIELDS = attrgetter("title", "entry_id")
+USER_AGENT = "arxiv-agent-memory (+https://github.com/Partha-SUST16/arxiv_agent_memory)"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+MEMORY_PAGE_SIZE = 20
+PAYLOAD_INDEXES = {
+    "user_id": models.PayloadSchemaType.KEYWORD,
+    "created_at": models.PayloadSchemaType.DATETIME,
+}
+MEMORY_CONTEXT_POOL = 50
+MEMORY_CONTEXT_TOP_K = 3
+MEMORY_SIMILARITY_THRESHOLD = 0.5
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMS = 1536
+SEARCHED_FOR_PATTERN = re.compile(r"\*\*🔍 Searched for:\*\* (.+)")
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Start a long-lived event loop in a daemon thread, shared across reruns."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+def iter_async(agen: AsyncIterator) -> Iterator:
+    """Drive an async generator on the shared event loop from synchronous code."""
+    loop = get_event_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+
+async def merge_async(agens: List[AsyncIterator]) -> AsyncIterator[Tuple[int, Any]]:
+    """Consume several async iterators concurrently.
+    
+    Yields (index, item) pairs in arrival order, where index is the position
+    of the source iterator. The first error raised by a source is re-raised.
+    Every source is closed once merging stops, however it stops.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def pump(index: int, agen: AsyncIterator):
+        async for item in agen:
+            await queue.put((index, item))
+    
+    tasks = [asyncio.create_task(pump(index, agen)) for index, agen in enumerate(agens)]
+    for task in tasks:
+        task.add_done_callback(queue.put_nowait)
+    
+    try:
+        pending = len(tasks)
+        while pending:
+            entry = await queue.get()
+            if isinstance(entry, asyncio.Task):
+                pending -= 1
+                entry.result()
+                continue
+            yield entry
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_all_async(agens)
+
+
+async def close_all_async(sources: List[Any]):
+    """Close async generators and streams, releasing any connections they hold."""
+    closers = []
+    for source in sources:
+        close = getattr(source, "aclose", None) or getattr(source, "close", None)
+        if close is not None:
+            closers.append(close())
+    await asyncio.gather(*closers, return_exceptions=True)
+
+
+@st.cache_resource
+def get_http_client() -> httpx.AsyncClient:
+    """Create the keep-alive HTTP client used for every arXiv request.
+    
+    Streamlit reruns the script on each interaction, so the client is cached
+    to keep its connection pool (and TLS sessions) warm between reruns.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+    )
+    return httpx.AsyncClient(transport=transport, headers={"User-Agent": USER_AGENT})
+
+
+@st.cache_resource
+def get_rate_limiter() -> AsyncLimiter:
+    """Limit arXiv API calls to one every three seconds, as arXiv asks of clients."""
+    return AsyncLimiter(max_rate=1, time_period=3)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Check whether an error is a rate-limit or server response worth retrying."""
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in RETRY_STATUS_CODES
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client(api_key: str) -> OpenAI:
+    """Create the OpenAI client with a keep-alive HTTP/2 pool, cached per API key."""
+    return OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    )
+
+
+@st.cache_resource
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Create the async OpenAI client, cached per API key."""
+    return AsyncOpenAI(api_key=api_key)
+
+
+class EmbeddingStore:
+    """Cached embeddings stored as the rows of one contiguous float16 matrix.
+    
+    Keeping every vector in a single array halves the memory of float32 and
+    lets similarity scoring run as one matrix-vector product.
+    """
+    
+    def __init__(self, dims: int = EMBEDDING_DIMS, capacity: int = 256):
+        self._emb = np.empty((capacity, dims), dtype=np.float16)
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+    
+    def add(self, key: str, vector: np.ndarray):
+        """Store a vector under a key, growing the matrix when it is full."""
+        with self._lock:
+            if key in self._rows:
+                return
+            row = len(self._rows)
+            if row == len(self._emb):
+                grown = np.empty((2 * len(self._emb), self._emb.shape[1]), dtype=np.float16)
+                grown[:row] = self._emb
+                self._emb = grown
+            self._emb[row] = vector
+            self._rows[key] = row
+    
+    def scores(self, keys: List[str], query: np.ndarray) -> np.ndarray:
+        """Dot product of the query with the stored vector of each key."""
+        rows = [self._rows[key] for key in keys]
+        # NumPy has no BLAS kernel for float16, so upcast the gathered rows
+        return self._emb[rows].astype(np.float32) @ query.astype(np.float32)
+
+
+@st.cache_resource
+def get_embedding_store() -> EmbeddingStore:
+    """Create the embedding store shared by every rerun and session."""
+    return EmbeddingStore()
+
+
+@st.cache_resource(show_spinner=False)
+def get_memory(memory_config: Dict[str, Any], api_key: str) -> Memory:
+    """Create the mem0 memory (and its Qdrant client) once per configuration.
+    
+    The API key is part of the cache key because mem0 reads OPENAI_API_KEY
+    from the environment when it is constructed.
+    """
+    memory = Memory.from_config(memory_config)
+    _tune_collection(memory)
+    return memory
+
+
+def _tune_collection(memory: Memory):
+    """Apply storage and index settings mem0 doesn't expose to the Qdrant collection.
+    
+    Vectors are scalar-quantized to int8 and the quantized copy is pinned in
+    RAM, while the originals and payloads stay on disk. Payload indexes let
+    Qdrant filter by user and sort by time without scanning every point.
+    """
+    vector_store = memory.vector_store
+    try:
+        vector_store.client.update_collection(
+            collection_name=vector_store.collection_name,
+            quantization_config=models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    always_ram=True
+                )
+            ),
+            hnsw_config=models.HnswConfigDiff(m=16, ef_construct=100),
+            collection_params=models.CollectionParamsDiff(on_disk_payload=True)
+        )
+    except Exception as e:
+        logger.warning("Could not tune collection %s: %s", vector_store.collection_name, e)
+    
+    # Creating an index that already exists is a no-op in Qdrant
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        try:
+            vector_store.client.create_payload_index(
+                collection_name=vector_store.collection_name,
+                field_name=field_name,
+                field_schema=field_schema
+            )
+        except Exception as e:
+            logger.warning("Could not index %s in %s: %s", field_name, vector_store.collection_name, e)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_memories_page(_memory: Memory, collection_name: str, user_id: str,
+                         limit: int, offset: int) -> List[Dict[str, Any]]:
+    """Fetch one page of a user's memories, newest first, without their vectors.
+    
+    The memory argument is excluded from the cache key, so the collection name
+    is passed alongside it to keep collections apart.
+    """
+    points, _ = _memory.vector_store.client.scroll(
+        collection_name=collection_name,
+        scroll_filter=models.Filter(must=[
+            models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))
+        ]),
+        limit=offset + limit,
+        order_by=models.OrderBy(key="created_at", direction=models.Direction.DESC),
+        with_payload=["data", "created_at"],
+        with_vectors=False
+    )
+    return [
+        {
+            "id": str(point.id),
+            "memory": point.payload.get("data", ""),
+            "created_at": point.payload.get("created_at"),
+        }
+        for point in points[offset:]
+    ]
+
+
+@dataclass(slots=True)
+class Paper:
+    """Metadata of a single arXiv paper."""
+    title: str
+    id: str
+    entry_id: str
+    authors: Tuple[str, ...]
+    primary_category: Optional[str]
+    categories: Tuple[str, ...]
+    published: Optional[str]
+    pdf_url: Optional[str]
+    links: Tuple[str, ...]
+    summary: str
+    comment: Optional[str]
+
+
+class SearchCache:
+    """In-memory LRU cache of arXiv search results with a time-to-live."""
+    
+    def __init__(self, max_entries: int = 1000, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, List[Paper]]]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(search_query: str, max_results: int) -> str:
+        """Build the cache key for a search."""
+        return hashlib.blake2b(f"{search_query}|{max_results}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[float, List[Paper]]]:
+        """Return (fetched_at, papers) for a key, including expired entries."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def is_fresh(self, fetched_at: float) -> bool:
+        """Check whether an entry fetched at the given time is still valid."""
+        return time.time() - fetched_at < self.ttl
+    
+    def put(self, key: str, papers: List[Paper]):
+        """Store papers for a key, evicting the least recently used entries."""
+        self._entries[key] = (time.time(), papers)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def get_search_cache() -> SearchCache:
+    """Create the search cache shared by every rerun and session."""
+    return SearchCache(max_entries=1000, ttl=300)
+
+
+@st.cache_resource(show_spinner=False)
+def _read_config(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse the config file, cached until its modification time changes."""
+    return orjson.loads(Path(path).read_bytes())
 
 
 class ConfigManager:
@@ -25,31 +348,50 @@ class ConfigManager:
                 "collection_name": "arxiv_memories"
             })
     
+    def _read(self) -> Dict[str, Any]:
+        """Return the cached config, re-reading the file only after it changes."""
+        return _read_config(self.config_file, os.stat(self.config_file).st_mtime_ns)
+    
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file."""
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            # Hand out a copy so callers can't mutate the cached dict
+            return dict(self._read())
         except Exception as e:
             st.error(f"Error loading config: {e}")
             return {}
     
     def save_config(self, config: Dict[str, Any]):
-        """Save configuration to file."""
+        """Save configuration to file, skipping the write when nothing changed."""
+        # A missing or unreadable file counts as changed, so a corrupt config
+        # gets overwritten instead of blocking every save
+        try:
+            if config == self._read():
+                return
+        except Exception:
+            pass
+        
+        # Write to a temporary file first so a crash never leaves a partial config
+        tmp_file = f"{self.config_file}.tmp"
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            Path(tmp_file).write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_file, self.config_file)
+            _read_config.clear()
         except Exception as e:
             st.error(f"Error saving config: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
 
 
 class ArxivSearchEngine:
     """Handles arXiv paper searching functionality."""
     
     def __init__(self):
-        self.client = arxiv.Client()
+        self.http_client = get_http_client()
+        self.limiter = get_rate_limiter()
+        self.cache = get_search_cache()
     
-    def search_papers(self, search_query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    def search_papers(self, search_query: str, max_results: int = 10) -> List[Paper]:
         """Search arXiv for papers based on the given query.
         
         Args:
@@ -57,53 +399,178 @@ class ArxivSearchEngine:
             max_results: Maximum number of results to return
             
         Returns:
-            List of paper dictionaries with metadata
+            List of papers with metadata
         """
-        search = arxiv.Search(
-            query=f"all:{search_query}",
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance,
-            sort_order=arxiv.SortOrder.Descending
-        )
+        return list(iter_async(self.search_papers_async(search_query, max_results)))
+    
+    async def search_papers_async(self, search_query: str, max_results: int = 10) -> AsyncIterator[Paper]:
+        """Stream papers from the arXiv Atom API as their entries are parsed.
+        
+        Args:
+            search_query: The search query to find papers
+            max_results: Maximum number of results to return
+            
+        Yields:
+            Papers with metadata, in relevance order
+        """
+        cache_key = SearchCache.make_key(search_query, max_results)
+        cached = self.cache.get(cache_key)
+        if cached and self.cache.is_fresh(cached[0]):
+            for paper in cached[1]:
+                yield paper
+            return
+        
+        # arXiv serves at most ARXIV_PAGE_SIZE results per call, so larger
+        # searches are split into pages. The first page is streamed while the
+        # rest download concurrently (still paced by the rate limiter) and are
+        # emitted in page order to keep the relevance ranking intact.
+        starts = range(0, max_results, ARXIV_PAGE_SIZE)
+        later_pages = [
+            asyncio.create_task(self._fetch_page(search_query, start, min(ARXIV_PAGE_SIZE, max_results - start)))
+            for start in starts[1:]
+        ]
         
         papers = []
-        for result in self.client.results(search):
-            try:
-                paper = self._extract_paper_data(result)
-                papers.append(paper)
-            except Exception as e:
-                st.warning(f"Error processing article: {e}")
+        seen = set()
+        try:
+            # Only a single-page search can be revalidated against the cache
+            first_page = self._stream_page(
+                search_query, 0, min(ARXIV_PAGE_SIZE, max_results),
+                cached if not later_pages else None
+            )
+            async for paper in first_page:
+                if paper.entry_id not in seen:
+                    seen.add(paper.entry_id)
+                    papers.append(paper)
+                    yield paper
+            
+            for task in later_pages:
+                for paper in await task:
+                    if paper.entry_id not in seen:
+                        seen.add(paper.entry_id)
+                        papers.append(paper)
+                        yield paper
+        finally:
+            for task in later_pages:
+                task.cancel()
+            # Retrieve every outcome so failed pages don't log unretrieved exceptions
+            await asyncio.gather(*later_pages, return_exceptions=True)
         
-        return papers
+        self.cache.put(cache_key, papers)
     
-    def _extract_paper_data(self, result) -> Dict[str, Any]:
-        """Extract relevant data from an arXiv result object."""
-        return {
-            "title": result.title,
-            "id": result.get_short_id(),
-            "entry_id": result.entry_id,
-            "authors": [author.name for author in result.authors],
-            "primary_category": result.primary_category,
-            "categories": result.categories,
-            "published": result.published.isoformat() if result.published else None,
-            "pdf_url": result.pdf_url,
-            "links": [link.href for link in result.links],
-            "summary": result.summary,
-            "comment": result.comment,
+    async def _fetch_page(self, search_query: str, start: int, count: int) -> List[Paper]:
+        """Fetch one page of results into a list."""
+        return [paper async for paper in self._stream_page(search_query, start, count)]
+    
+    async def _stream_page(self, search_query: str, start: int, count: int,
+                           cached: Optional[Tuple[float, List[Paper]]] = None
+                           ) -> AsyncIterator[Paper]:
+        """Stream one page of results as its entries are parsed.
+        
+        When an expired cache entry is given, it is revalidated with
+        If-Modified-Since and replayed if arXiv answers 304 Not Modified.
+        """
+        headers = {"If-Modified-Since": formatdate(cached[0], usegmt=True)} if cached else {}
+        params = {
+            "search_query": f"all:{search_query}",
+            "start": start,
+            "max_results": count,
+            "sortBy": "relevance",
+            "sortOrder": "descending",
         }
+        parser = etree.XMLPullParser(events=("end",), tag=f"{ATOM_NS}entry")
+        
+        response = await self._open_feed(params, headers)
+        try:
+            if cached and response.status_code == 304:
+                for paper in cached[1]:
+                    yield paper
+                return
+            
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+                for paper in self._read_entries(parser):
+                    yield paper
+        finally:
+            await response.aclose()
+        
+        parser.close()
+        for paper in self._read_entries(parser):
+            yield paper
+    
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        wait=wait_exponential(min=1, max=30),
+        stop=stop_after_attempt(5),
+        reraise=True
+    )
+    async def _open_feed(self, params: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+        """Send a rate-limited API request, backing off on 429 and 5xx responses.
+        
+        The response is returned unread; the caller must close it.
+        """
+        async with self.limiter:
+            request = self.http_client.build_request("GET", ARXIV_API_URL, params=params, headers=headers)
+            response = await self.http_client.send(request, stream=True)
+        
+        if response.status_code in RETRY_STATUS_CODES:
+            await response.aclose()
+            response.raise_for_status()
+        return response
+    
+    def _read_entries(self, parser: etree.XMLPullParser) -> List[Paper]:
+        """Extract every <entry> the parser has completed so far, skipping malformed ones."""
+        papers = []
+        for _, elem in parser.read_events():
+            papers.append(self._extract_paper_data(elem))
+            # Free the parsed entry and any siblings already handled
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return [paper for paper in papers if all(REQUIRED_PAPER_FIELDS(paper))]
+    
+    def _extract_paper_data(self, entry: etree._Element) -> Paper:
+        """Extract relevant data from an Atom <entry> element."""
+        entry_id = entry.findtext(f"{ATOM_NS}id", "")
+        links = entry.findall(f"{ATOM_NS}link")
+        primary_category = entry.find(f"{ARXIV_NS}primary_category")
+        return Paper(
+            title=" ".join(entry.findtext(f"{ATOM_NS}title", "").split()),
+            id=entry_id.split("arxiv.org/abs/")[-1],
+            entry_id=entry_id,
+            authors=tuple(name.text or "" for name in entry.iterfind(f"{ATOM_NS}author/{ATOM_NS}name")),
+            primary_category=primary_category.get("term") if primary_category is not None else None,
+            categories=tuple(category.get("term") for category in entry.iterfind(f"{ATOM_NS}category")),
+            published=entry.findtext(f"{ATOM_NS}published"),
+            pdf_url=next((link.get("href") for link in links if link.get("title") == "pdf"), None),
+            links=tuple(link.get("href") for link in links),
+            summary=entry.findtext(f"{ATOM_NS}summary", "").strip(),
+            comment=entry.findtext(f"{ARXIV_NS}comment"),
+        )
 
 
 class PaperProcessor:
     """Handles processing and formatting of paper data."""
     
-    def __init__(self, openai_client: OpenAI):
+    CHUNK_SIZE = 5
+    PROMPT_FIELDS = ("title", "authors", "summary", "pdf_url")
+    
+    def __init__(self, openai_client: AsyncOpenAI):
         self.openai_client = openai_client
     
-    def format_papers_to_markdown(self, papers: List[Dict[str, Any]]) -> str:
+    def format_papers_to_markdown(self, papers: List[Paper], placeholder=None,
+                                  use_llm: bool = False) -> str:
         """Convert paper data to structured markdown format.
         
+        Papers are formatted locally unless use_llm is set. GPT formatting runs
+        in chunks of CHUNK_SIZE with concurrent, streamed completions so the
+        first rows appear while later chunks are pending.
+        
         Args:
-            papers: List of paper dictionaries
+            papers: List of papers
+            placeholder: Optional Streamlit element updated as tokens arrive
+            use_llm: Whether to prettify the results with GPT
             
         Returns:
             Formatted markdown string
@@ -111,20 +578,55 @@ class PaperProcessor:
         if not papers:
             return "No papers found for the given query."
         
+        if not use_llm:
+            return self._fallback_formatting(papers)
+        
+        chunks = [papers[i:i + self.CHUNK_SIZE] for i in range(0, len(papers), self.CHUNK_SIZE)]
+        outputs: List[List[str]] = [[] for _ in chunks]
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": self._create_formatting_prompt(papers)}],
-                temperature=0.2
-            )
-            return response.choices[0].message.content
+            for index, delta in iter_async(self._format_async(chunks)):
+                outputs[index].append(delta)
+                if placeholder is not None:
+                    placeholder.markdown(self._join_outputs(outputs))
+            return self._join_outputs(outputs)
         except Exception as e:
             st.error(f"Error formatting papers: {e}")
             return self._fallback_formatting(papers)
     
-    def _create_formatting_prompt(self, papers: List[Dict[str, Any]]) -> str:
+    async def _format_async(self, chunks: List[List[Paper]]) -> AsyncIterator[Tuple[int, str]]:
+        """Stream (chunk index, text delta) pairs from one completion per chunk."""
+        results = await asyncio.gather(*(
+            self.openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": self._create_formatting_prompt(chunk)}],
+                temperature=0.2,
+                stream=True
+            )
+            for chunk in chunks
+        ), return_exceptions=True)
+        
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # Release the streams that did open before giving up
+            await close_all_async([result for result in results if not isinstance(result, BaseException)])
+            raise errors[0]
+        
+        streams = results
+        async for index, event in merge_async(streams):
+            if event.choices and event.choices[0].delta.content:
+                yield index, event.choices[0].delta.content
+    
+    @staticmethod
+    def _join_outputs(outputs: List[List[str]]) -> str:
+        """Join the streamed output of every chunk in chunk order."""
+        return "\n\n".join("".join(parts) for parts in outputs if parts)
+    
+    def _create_formatting_prompt(self, papers: List[Paper]) -> str:
         """Create the prompt for GPT to format papers."""
-        papers_text = str(papers)
+        papers_text = orjson.dumps(
+            [{key: getattr(paper, key) for key in self.PROMPT_FIELDS} for paper in papers]
+        ).decode()
         return f"""
         Based on the following arXiv search result, provide a proper structured output in markdown that is readable by the users. 
         Each paper should have a title, authors, abstract, and link.
@@ -132,16 +634,22 @@ class PaperProcessor:
         Output Format: Table with the following columns: [{{"title": "Paper Title", "authors": "Author Names", "abstract": "Brief abstract", "link": "arXiv link"}}, ...]
         """
     
-    def _fallback_formatting(self, papers: List[Dict[str, Any]]) -> str:
-        """Fallback formatting when GPT processing fails."""
-        markdown = "## Search Results\n\n"
-        for i, paper in enumerate(papers, 1):
-            markdown += f"### {i}. {paper.get('title', 'No title')}\n"
-            markdown += f"**Authors:** {', '.join(paper.get('authors', []))}\n\n"
-            markdown += f"**Abstract:** {paper.get('summary', 'No abstract available')}\n\n"
-            markdown += f"**Link:** {paper.get('pdf_url', 'No link available')}\n\n"
-            markdown += "---\n\n"
-        return markdown
+    def _fallback_formatting(self, papers: List[Paper]) -> str:
+        """Format papers locally with a markdown template (no LLM call)."""
+        return "## Search Results\n\n" + "".join(
+            self.render_paper(i, paper) for i, paper in enumerate(papers, 1)
+        )
+    
+    @staticmethod
+    def render_paper(index: int, paper: Paper) -> str:
+        """Render a single paper as a numbered markdown section."""
+        return (
+            f"### {index}. {paper.title or 'No title'}\n"
+            f"**Authors:** {', '.join(paper.authors)}\n\n"
+            f"**Abstract:** {paper.summary or 'No abstract available'}\n\n"
+            f"**Link:** {paper.pdf_url or 'No link available'}\n\n"
+            "---\n\n"
+        )
 
 
 
@@ -200,9 +708,9 @@ class ArxivAgentApp:
         
         # Initialize services
         self.memory = self._initialize_memory(config)
-        self.openai_client = OpenAI(api_key=self.api_keys['openai'])
+        self.openai_client = get_openai_client(self.api_keys['openai'])
         self.search_engine = ArxivSearchEngine()
-        self.processor = PaperProcessor(self.openai_client)
+        self.processor = PaperProcessor(get_async_openai_client(self.api_keys['openai']))
         
         # Setup UI
         self._setup_sidebar(config)
@@ -222,7 +730,7 @@ class ArxivAgentApp:
                 }
             },
         }
-        return Memory.from_config(memory_config)
+        return get_memory(memory_config, self.api_keys['openai'])
     
     def _setup_sidebar(self, config: Dict[str, Any]):
         """Setup the sidebar components."""
@@ -240,6 +748,12 @@ class ArxivAgentApp:
         if self.user_id != saved_username and self.user_id:
             config["default_username"] = self.user_id
             self.config_manager.save_config(config)
+        
+        st.sidebar.checkbox(
+            "Debug mode",
+            key="debug",
+            help="Log full tracebacks of errors to the server console"
+        )
     
     def _setup_main_content(self):
         """Setup the main content area with tabs."""
@@ -252,8 +766,12 @@ class ArxivAgentApp:
         with tab2:
             self._setup_memory_tab()
     
+    @st.fragment
     def _setup_search_tab(self):
-        """Setup the search tab content."""
+        """Setup the search tab content.
+        
+        Runs as a fragment, so searching reruns only this tab, not the app.
+        """
         st.header("Research Paper Search")
         
         search_query = st.text_input(
@@ -265,9 +783,14 @@ class ArxivAgentApp:
         col1, col2 = st.columns([1, 4])
         with col1:
             search_button = st.button('🔍 Search for Papers', type="primary")
+        with col2:
+            prettify = st.toggle(
+                "✨ Prettify with GPT",
+                help="Format the results with GPT-4o-mini instead of the built-in layout"
+            )
         
         if search_button and search_query:
-            self._perform_search(search_query)
+            self._perform_search(search_query, prettify)
     
     def _setup_memory_tab(self):
         """Setup the memory tab content."""
@@ -277,16 +800,40 @@ class ArxivAgentApp:
             st.info("Please enter a username in the sidebar to view your memories.")
             return
         
-        memories = self.get_all_memories(self.user_id)
-        if "results" in memories and memories["results"]:
-            # Iterate backwards to show the most recent searches first
-            for mem in reversed(memories["results"]):
+        offset_key = f"memory_offset_{self.user_id}"
+        offset = st.session_state.get(offset_key, 0)
+        
+        # Fetch one extra memory to know whether an older page exists
+        memories = self.get_memories_page(self.user_id, limit=MEMORY_PAGE_SIZE + 1, offset=offset)
+        if memories:
+            for mem in memories[:MEMORY_PAGE_SIZE]:
                 st.markdown(mem['memory'])
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button(
+                    "⬅️ Newer",
+                    disabled=offset == 0,
+                    on_click=self._change_memory_page,
+                    args=(offset_key, offset - MEMORY_PAGE_SIZE)
+                )
+            with col2:
+                st.button(
+                    "Older ➡️",
+                    disabled=len(memories) <= MEMORY_PAGE_SIZE,
+                    on_click=self._change_memory_page,
+                    args=(offset_key, offset + MEMORY_PAGE_SIZE)
+                )
         else:
             st.info("No memories found. Start searching for papers to build your research history!")
     
+    @staticmethod
+    def _change_memory_page(offset_key: str, offset: int):
+        """Move the memory tab to the page starting at the given offset."""
+        st.session_state[offset_key] = max(offset, 0)
+    
     
-    def _perform_search(self, search_query: str):
+    def _perform_search(self, search_query: str, prettify: bool = False):
         """Perform the paper search and display results."""
         if not self.user_id:
             st.error("Please enter a username in the sidebar first.")
@@ -300,13 +847,17 @@ class ArxivAgentApp:
                     search_query
                 )
                 
-                # Search for papers
-                papers = self.search_engine.search_papers(enhanced_query)
+                # Search for papers, showing each one as soon as it arrives
+                results_placeholder = st.empty()
+                papers = self._stream_search(enhanced_query, results_placeholder)
                 
                 if papers:
-                    # Format and display results
-                    formatted_results = self.processor.format_papers_to_markdown(papers)
-                    st.markdown(formatted_results)
+                    # Replace the streamed results with the GPT formatting
+                    if prettify:
+                        formatted_results = self.processor.format_papers_to_markdown(
+                            papers, results_placeholder, use_llm=True
+                        )
+                        results_placeholder.markdown(formatted_results)
                     
                     # Store search in memory
                     self._store_search_in_memory(search_query, papers)
@@ -315,45 +866,113 @@ class ArxivAgentApp:
                     
             except Exception as e:
                 st.error(f"An error occurred during search: {e}")
-                st.exception(e)  # This will show the full traceback for debugging
+                if st.session_state.get("debug"):
+                    logger.exception("Search failed")
+    
+    def _stream_search(self, search_query: str, placeholder) -> List[Paper]:
+        """Collect search results, rendering each paper as soon as it is parsed."""
+        papers = []
+        results = placeholder.container()
+        for paper in iter_async(self.search_engine.search_papers_async(search_query)):
+            if not papers:
+                results.markdown("## Search Results")
+            papers.append(paper)
+            results.markdown(self.processor.render_paper(len(papers), paper))
+        return papers
     
     def _enhance_query_with_memory(self, query: str) -> str:
-        """Enhance search query with relevant memory context."""
+        """Enhance search query with relevant memory context.
+        
+        Recent memories are ranked by cosine similarity to the query, and the
+        past searches of the closest ones are appended. Memory embeddings are
+        cached, so usually only the query itself is embedded.
+        """
         try:
-            return query
+            memories = self.get_memories_page(self.user_id, limit=MEMORY_CONTEXT_POOL)
+            candidates = []
+            for mem in memories:
+                match = SEARCHED_FOR_PATTERN.search(mem['memory'])
+                if match and match.group(1).strip().lower() != query.strip().lower():
+                    candidates.append((mem['memory'], match.group(1).strip()))
+            if not candidates:
+                return query
+            
+            store = get_embedding_store()
+            keys = [hashlib.blake2b(text.encode()).hexdigest() for text, _ in candidates]
+            missing = {key: text for key, (text, _) in zip(keys, candidates) if key not in store}
+            
+            # Embed the query and any uncached memories in a single request
+            response = self.openai_client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=[query, *missing.values()]
+            )
+            vectors = [np.asarray(item.embedding, dtype=np.float32) for item in response.data]
+            for key, vector in zip(missing, vectors[1:]):
+                store.add(key, vector)
+            
+            # OpenAI embeddings are unit length, so the dot product is the cosine
+            sims = store.scores(keys, vectors[0])
+            top = np.arange(len(sims))
+            if len(sims) > MEMORY_CONTEXT_TOP_K:
+                top = np.argpartition(-sims, MEMORY_CONTEXT_TOP_K)[:MEMORY_CONTEXT_TOP_K]
+            top = top[np.argsort(-sims[top])]
+            
+            related = []
+            for i in top:
+                past_query = candidates[i][1]
+                if sims[i] >= MEMORY_SIMILARITY_THRESHOLD and past_query not in related:
+                    related.append(past_query)
+            return " ".join([query, *related])
         except Exception as e:
             st.error(f"Error enhancing query with memory: {e}")
             return query
     
-    def _store_search_in_memory(self, query: str, papers: List[Dict[str, Any]]):
+    def _store_search_in_memory(self, query: str, papers: List[Paper]):
         """Store the search query and results in memory as a single markdown entry."""
         try:
-            paper_titles = [paper.get('title', 'No Title') for paper in papers]
+            paper_titles = [paper.title or 'No Title' for paper in papers]
             
             # Create a single markdown formatted string
-            markdown_memory = f"**🔍 Searched for:** {query}\n\n"
+            parts = [f"**🔍 Searched for:** {query}\n\n"]
             if paper_titles:
-                markdown_memory += "**📄 Found Papers:**\n"
-                for title in paper_titles:
-                    markdown_memory += f"- {title}\n"
-            markdown_memory += "\n---\n"
+                parts.append("**📄 Found Papers:**\n")
+                parts.extend(f"- {title}\n" for title in paper_titles)
+            parts.append("\n---\n")
+            markdown_memory = "".join(parts)
 
-            # Add the formatted markdown string as a single memory entry, without inference
+            # Add the formatted markdown string as a single memory entry in the
+            # background, so the embedding and upsert don't hold up the UI
+            threading.Thread(
+                target=self._add_memory,
+                args=([{"role": "user", "content": markdown_memory}], self.user_id),
+                daemon=True
+            ).start()
+        except Exception as e:
+            st.warning(f"Could not store search in memory: {e}")
+            if st.session_state.get("debug"):
+                logger.exception("Could not store search in memory")
+    
+    def _add_memory(self, messages: List[Dict[str, str]], user_id: str):
+        """Add messages to memory without inference; runs on a background thread."""
+        try:
             self.memory.add(
-                messages=markdown_memory,
-                user_id=self.user_id,
+                messages=messages,
+                user_id=user_id,
                 infer=False
             )
-        except Exception as e:
-            st.warning(f"Could not store search in memory: {e}")
-            st.exception(e) # Show full traceback for debugging
+            _fetch_memories_page.clear()
+        except Exception:
+            logger.exception("Could not store search in memory")
 
-    def get_all_memories(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get all memories for a user."""
+    def get_memories_page(self, user_id: str, limit: int = MEMORY_PAGE_SIZE,
+                          offset: int = 0) -> List[Dict[str, Any]]:
+        """Get one page of memories for a user, most recent first."""
         try:
-            return self.memory.get_all(user_id=user_id)
+            return _fetch_memories_page(
+                self.memory, self.memory.vector_store.collection_name, user_id, limit, offset
+            )
         except Exception as e:
-            st.warning(f"Error retrieving all memories: {e}")
+            st.warning(f"Error retrieving memories: {e}")
             return []
     
     def _show_api_warning(self):